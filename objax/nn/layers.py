@@ -14,11 +14,12 @@
 
 __all__ = ['BatchNorm', 'BatchNorm0D', 'BatchNorm1D', 'BatchNorm2D',
            'Conv2D', 'ConvTranspose2D', 'Dropout', 'Linear',
-           'MovingAverage', 'ExponentialMovingAverage', 'Sequential',
+           'MovingAverage', 'ExponentialMovingAverage', 'ScannedSequential', 'Sequential',
            'SyncedBatchNorm', 'SyncedBatchNorm0D', 'SyncedBatchNorm1D', 'SyncedBatchNorm2D']
 
+import copy
 import inspect
-from typing import Callable, Iterable, Tuple, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple, Optional, Union
 
 from jax import numpy as jn, random as jr, lax
 
@@ -27,7 +28,7 @@ from objax.constants import ConvPadding
 from objax.module import ModuleList, Module
 from objax.nn.init import kaiming_normal, xavier_normal
 from objax.typing import JaxArray
-from objax.variable import TrainVar, StateVar
+from objax.variable import BaseState, BaseVar, RandomState, TrainVar, StateVar
 
 
 class BatchNorm(Module):
@@ -38,7 +39,8 @@ class BatchNorm(Module):
     <https://arxiv.org/abs/1502.03167>`_.
     """
 
-    def __init__(self, dims: Iterable[int], redux: Iterable[int], momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, dims: Iterable[int], redux: Iterable[int], momentum: float = 0.999, eps: float = 1e-6,
+                 dtype: jn.dtype = jn.float32):
         """Creates a BatchNorm module instance.
 
         Args:
@@ -46,16 +48,18 @@ class BatchNorm(Module):
             redux: list of indices of reduction axes. Batch norm statistics are computed by averaging over these axes.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            dtype: data type of the running statistics and of the trainable parameters, for example jn.bfloat16 to
+                halve their memory footprint in mixed precision.
         """
         super().__init__()
         dims = tuple(dims)
         self.momentum = momentum
         self.eps = eps
         self.redux = tuple(redux)
-        self.running_mean = StateVar(jn.zeros(dims))
-        self.running_var = StateVar(jn.ones(dims))
-        self.beta = TrainVar(jn.zeros(dims))
-        self.gamma = TrainVar(jn.ones(dims))
+        self.running_mean = StateVar(jn.zeros(dims, dtype))
+        self.running_var = StateVar(jn.ones(dims, dtype))
+        self.beta = TrainVar(jn.zeros(dims, dtype))
+        self.gamma = TrainVar(jn.ones(dims, dtype))
 
     def __call__(self, x: JaxArray, training: bool) -> JaxArray:
         """Performs batch normalization of input tensor.
@@ -69,14 +73,22 @@ class BatchNorm(Module):
             Batch normalized tensor.
         """
         if training:
-            m = x.mean(self.redux, keepdims=True)
-            v = (x ** 2).mean(self.redux, keepdims=True) - m ** 2
-            self.running_mean.value += (1 - self.momentum) * (m - self.running_mean.value)
-            self.running_var.value += (1 - self.momentum) * (v - self.running_var.value)
+            m, m2 = self._moments(x)
+            v = m2 - m * m
+            rm, rv = self.running_mean.value, self.running_var.value
+            self.running_mean.value = (self.momentum * rm + (1 - self.momentum) * m).astype(rm.dtype)
+            self.running_var.value = (self.momentum * rv + (1 - self.momentum) * v).astype(rv.dtype)
         else:
             m, v = self.running_mean.value, self.running_var.value
-        y = self.gamma.value * (x - m) * functional.rsqrt(v + self.eps) + self.beta.value
-        return y
+        scale = self.gamma.value * functional.rsqrt(v + self.eps)
+        bias = self.beta.value - scale * m
+        return scale.astype(x.dtype) * x + bias.astype(x.dtype)
+
+    def _moments(self, x: JaxArray) -> JaxArray:
+        """Returns the stacked batch statistics E[x] and E[x^2], computed in a single pass over x and shaped like the
+        state variables."""
+        redux = tuple(r % x.ndim + 1 for r in self.redux)
+        return jn.stack([x, x * x]).mean(redux).reshape((2,) + self.running_mean.value.shape)
 
 
 class BatchNorm0D(BatchNorm):
@@ -87,15 +99,16 @@ class BatchNorm0D(BatchNorm):
     <https://arxiv.org/abs/1502.03167>`_.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, dtype: jn.dtype = jn.float32):
         """Creates a BatchNorm0D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            dtype: data type of the running statistics and of the trainable parameters.
         """
-        super().__init__((1, nin), (0,), momentum, eps)
+        super().__init__((1, nin), (0,), momentum, eps, dtype)
 
 
 class BatchNorm1D(BatchNorm):
@@ -106,38 +119,67 @@ class BatchNorm1D(BatchNorm):
     <https://arxiv.org/abs/1502.03167>`_.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, dtype: jn.dtype = jn.float32):
         """Creates a BatchNorm1D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            dtype: data type of the running statistics and of the trainable parameters.
         """
-        super().__init__((1, nin, 1), (0, 2), momentum, eps)
+        super().__init__((1, nin, 1), (0, 2), momentum, eps, dtype)
 
 
 class BatchNorm2D(BatchNorm):
-    """Applies a 2D batch normalization on a 4D-input batch of shape (N,C,H,W).
+    """Applies a 2D batch normalization on a 4D-input batch of shape (N,C,H,W) or (N,H,W,C).
 
     The module follows the operation described in Algorithm 1 of
     `Batch Normalization: Accelerating Deep Network Training by Reducing Internal Covariate Shift
     <https://arxiv.org/abs/1502.03167>`_.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, nhwc: bool = False,
+                 dtype: jn.dtype = jn.float32):
         """Creates a BatchNorm2D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            nhwc: if True the input batch has shape (N,H,W,C), otherwise (N,C,H,W).
+            dtype: data type of the running statistics and of the trainable parameters.
+        """
+        if nhwc:
+            super().__init__((1, 1, 1, nin), (0, 1, 2), momentum, eps, dtype)
+        else:
+            super().__init__((1, nin, 1, 1), (0, 2, 3), momentum, eps, dtype)
+
+    def fold_into(self, conv: 'Conv2D') -> 'Conv2D':
+        """Returns a copy of a convolution with this batch normalization, in evaluation mode, folded into its weights.
+
+        The returned module computes ``bn(conv(x), training=False)`` with a single convolution, which removes the
+        cost of batch normalization at inference. Later changes to the running statistics are not reflected in it.
+
+        Args:
+            conv: the convolution whose output is normalized by this batch normalization.
+
+        Returns:
+            A new Conv2D module with folded kernel and bias.
         """
-        super().__init__((1, nin, 1, 1), (0, 2, 3), momentum, eps)
+        assert not isinstance(conv, ConvTranspose2D), 'Folding into ConvTranspose2D is not supported'
+        scale = (self.gamma.value * functional.rsqrt(self.running_var.value + self.eps)).reshape(-1)
+        bias = self.beta.value.reshape(-1) - scale * self.running_mean.value.reshape(-1)
+        if conv.b is not None:
+            bias += scale * conv.b.value.reshape(-1)
+        folded = copy.copy(conv)
+        folded.w = TrainVar(conv.w.value * scale)  # Scales the O axis of the HWIO kernel.
+        folded.b = TrainVar(bias.reshape((1, 1, 1, -1) if conv.dimension_numbers[0] == 'NHWC' else (-1, 1, 1)))
+        return folded
 
 
 class Conv2D(Module):
-    """Applies a 2D convolution on a 4D-input batch of shape (N,C,H,W)."""
+    """Applies a 2D convolution on a 4D-input batch of shape (N,C,H,W) or (N,H,W,C)."""
 
     def __init__(self,
                  nin: int,
@@ -148,7 +190,8 @@ class Conv2D(Module):
                  groups: int = 1,
                  padding: ConvPadding = ConvPadding.SAME,
                  use_bias: bool = True,
-                 w_init: Callable = kaiming_normal):
+                 w_init: Callable = kaiming_normal,
+                 nhwc: bool = False):
         """Creates a Conv2D module instance.
 
         Args:
@@ -163,30 +206,32 @@ class Conv2D(Module):
             padding: padding of the input tensor, either Padding.SAME or Padding.VALID.
             use_bias: if True then convolution will have bias term.
             w_init: initializer for convolution kernel (a function that takes in a HWIO shape and returns a 4D matrix).
+            nhwc: if True the input and output tensors have shape (N,H,W,C), otherwise (N,C,H,W).
         """
         super().__init__()
         assert nin % groups == 0, 'nin should be divisible by groups'
         assert nout % groups == 0, 'nout should be divisible by groups'
-        self.b = TrainVar(jn.zeros((nout, 1, 1))) if use_bias else None
+        self.b = TrainVar(jn.zeros((1, 1, 1, nout) if nhwc else (nout, 1, 1))) if use_bias else None
         self.w = TrainVar(w_init((*util.to_tuple(k, 2), nin // groups, nout)))  # HWIO
         self.padding = padding
         self.strides = util.to_tuple(strides, 2)
         self.dilations = util.to_tuple(dilations, 2)
         self.groups = groups
+        self.dimension_numbers = ('NHWC', 'HWIO', 'NHWC') if nhwc else ('NCHW', 'HWIO', 'NCHW')
 
     def __call__(self, x: JaxArray) -> JaxArray:
         """Returns the results of applying the convolution to input x."""
         y = lax.conv_general_dilated(x, self.w.value, self.strides, self.padding.value,
                                      rhs_dilation=self.dilations,
                                      feature_group_count=self.groups,
-                                     dimension_numbers=('NCHW', 'HWIO', 'NCHW'))
-        if self.b:
+                                     dimension_numbers=self.dimension_numbers)
+        if self.b is not None:
             y += self.b.value
         return y
 
 
 class ConvTranspose2D(Conv2D):
-    """Applies a 2D transposed convolution on a 4D-input batch of shape (N,C,H,W).
+    """Applies a 2D transposed convolution on a 4D-input batch of shape (N,C,H,W) or (N,H,W,C).
 
     This module can be seen as a transformation going in the opposite direction of a normal convolution, i.e.,
     from something that has the shape of the output of some convolution to something that has the shape of its input
@@ -206,7 +251,8 @@ class ConvTranspose2D(Conv2D):
                  dilations: Union[Tuple[int, int], int] = 1,
                  padding: ConvPadding = ConvPadding.SAME,
                  use_bias: bool = True,
-                 w_init: Callable = kaiming_normal):
+                 w_init: Callable = kaiming_normal,
+                 nhwc: bool = False):
         """Creates a ConvTranspose2D module instance.
 
         Args:
@@ -219,17 +265,18 @@ class ConvTranspose2D(Conv2D):
             padding: padding of the input tensor, either Padding.SAME or Padding.VALID.
             use_bias: if True then convolution will have bias term.
             w_init: initializer for convolution kernel (a function that takes in a HWIO shape and returns a 4D matrix).
+            nhwc: if True the input and output tensors have shape (N,H,W,C), otherwise (N,C,H,W).
         """
-        super().__init__(nin=nout, nout=nin, k=k, strides=strides, padding=padding, use_bias=False, w_init=w_init)
-        self.b = TrainVar(jn.zeros((nout, 1, 1))) if use_bias else None
-        self.dilations = util.to_tuple(dilations, 2)
+        super().__init__(nin=nout, nout=nin, k=k, strides=strides, dilations=dilations, padding=padding,
+                         use_bias=False, w_init=w_init, nhwc=nhwc)
+        self.b = TrainVar(jn.zeros((1, 1, 1, nout) if nhwc else (nout, 1, 1))) if use_bias else None
 
     def __call__(self, x: JaxArray) -> JaxArray:
         """Returns the results of applying the transposed convolution to input x."""
         y = lax.conv_transpose(x, self.w.value, self.strides, self.padding.value,
                                rhs_dilation=self.dilations,
-                               dimension_numbers=('NCHW', 'HWIO', 'NCHW'), transpose_kernel=True)
-        if self.b:
+                               dimension_numbers=self.dimension_numbers, transpose_kernel=True)
+        if self.b is not None:
             y += self.b.value
         return y
 
@@ -254,22 +301,29 @@ class Dropout(Module):
         Args:
             x: input tensor.
             training: if True then apply dropout to the input, otherwise keep input tensor unchanged.
+                It selects the computation at trace time, so it must be a Python bool; when compiling, mark it as
+                static (e.g. with ``static_argnums`` in objax.Jit) to get a specialized graph for each mode.
             dropout_keep: optional argument, when set overrides dropout keep probability.
+                Like training, it must be a Python number (static when compiling).
 
         Returns:
             Tensor with applied dropout.
         """
-        keep = dropout_keep or self.keep
+        keep = self.keep if dropout_keep is None else dropout_keep
         if not training or keep >= 1:
             return x
         keep_mask = jr.bernoulli(self.keygen(), keep, x.shape)
-        return jn.where(keep_mask, x / keep, 0)
+        # Selecting on the boolean mask (instead of multiplying by it) keeps the mask stored for the backward pass at
+        # one byte per element rather than widening it to the dtype of x (keep=0 drops everything).
+        scale = 1 / keep if keep > 0 else 0
+        return jn.where(keep_mask, x * scale, 0)
 
 
 class Linear(Module):
     """Applies a linear transformation on an input batch."""
 
-    def __init__(self, nin: int, nout: int, use_bias: bool = True, w_init: Callable = xavier_normal):
+    def __init__(self, nin: int, nout: int, use_bias: bool = True, w_init: Callable = xavier_normal,
+                 precision: Optional[lax.Precision] = None):
         """Creates a Linear module instance.
 
         Args:
@@ -277,21 +331,28 @@ class Linear(Module):
             nout: number of channels of the output tensor.
             use_bias: if True then linear layer will have bias term.
             w_init: weight initializer for linear layer (a function that takes in a IO shape and returns a 2D matrix).
+            precision: precision of the matrix multiplication, None for the backend default or a lax.Precision,
+                e.g. lax.Precision.HIGHEST for full float32 products on TPU or lax.Precision.DEFAULT for bfloat16 ones.
         """
         super().__init__()
         self.b = TrainVar(jn.zeros(nout)) if use_bias else None
         self.w = TrainVar(w_init((nin, nout)))
+        self.precision = precision
 
     def __call__(self, x: JaxArray) -> JaxArray:
         """Returns the results of applying the linear transformation to input x."""
-        y = jn.dot(x, self.w.value)
-        if self.b:
+        y = jn.dot(x, self.w.value, precision=self.precision)
+        if self.b is not None:
             y += self.b.value
         return y
 
 
 class MovingAverage(Module):
-    """Computes moving average of an input batch."""
+    """Computes moving average of an input batch.
+
+    The sum of ``buffer`` is kept in ``running_sum``, so the two variables must be assigned together: assigning
+    ``buffer`` alone leaves a stale average for up to ``buffer_size`` calls.
+    """
 
     def __init__(self, shape: Tuple[int, ...], buffer_size: int, init_value: float = 0):
         """Creates a MovingAverage module instance.
@@ -301,12 +362,35 @@ class MovingAverage(Module):
             buffer_size: buffer size for moving average.
             init_value: initial value for moving average buffer.
         """
+        self.buffer_size = buffer_size
         self.buffer = StateVar(jn.zeros((buffer_size,) + shape) + init_value)
+        self.index = StateVar(jn.array(0, jn.int32), reduce=lambda x: x[0])
+        self.running_sum = StateVar(self.buffer.value.sum(0))
 
     def __call__(self, x: JaxArray) -> JaxArray:
         """Update the statistics using x and return the moving average."""
-        self.buffer.value = jn.concatenate([self.buffer.value[1:], x[None]])
-        return self.buffer.value.mean(0)
+        # The buffer is used as a ring: x overwrites the oldest entry in place.
+        x = x.astype(self.buffer.value.dtype)
+        evicted = lax.dynamic_index_in_dim(self.buffer.value, self.index.value, 0, keepdims=False)
+        self.buffer.value = lax.dynamic_update_index_in_dim(self.buffer.value, x, self.index.value, 0)
+        self.index.value = (self.index.value + 1) % self.buffer_size
+        # The sum is updated incrementally and recomputed exactly once per pass over the ring to bound rounding errors.
+        # The branches are fixed functions of their operand so that the traced cond is cached across calls.
+        self.running_sum.value = lax.cond(self.index.value == 0, self._sum_buffer, self._update_sum,
+                                          (self.buffer.value, self.running_sum.value, evicted, x))
+        return self.running_sum.value / self.buffer_size
+
+    @staticmethod
+    def _sum_buffer(operand: Tuple[JaxArray, JaxArray, JaxArray, JaxArray]) -> JaxArray:
+        """Returns the exact sum of the buffer."""
+        buffer, _, _, _ = operand
+        return buffer.sum(0)
+
+    @staticmethod
+    def _update_sum(operand: Tuple[JaxArray, JaxArray, JaxArray, JaxArray]) -> JaxArray:
+        """Returns the running sum with the evicted entry replaced by x."""
+        _, running_sum, evicted, x = operand
+        return running_sum - evicted + x
 
 
 class ExponentialMovingAverage(Module):
@@ -325,7 +409,7 @@ class ExponentialMovingAverage(Module):
 
     def __call__(self, x: JaxArray) -> JaxArray:
         """Update the statistics using x and return the exponential moving average."""
-        self.avg.value += (self.avg.value - x) * (self.momentum - 1)
+        self.avg.value = self.momentum * self.avg.value + (1 - self.momentum) * x
         return self.avg.value
 
 
@@ -335,32 +419,161 @@ class Sequential(ModuleList):
     def __call__(self, x: JaxArray, **kwargs) -> JaxArray:
         """Execute the sequence of operation contained on ``x`` and ``**kwargs`` and return result."""
         for f in self:
+            x = f(x, **self._local_kwargs(f, kwargs))
+        return x
+
+    def _local_kwargs(self, f: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the subset of kwargs accepted by f."""
+        s = self._parameters(f)
+        if s is None:
+            return kwargs
+        return {k: v for k, v in kwargs.items() if k in s}
+
+    def _parameters(self, f: Callable) -> Optional[FrozenSet[str]]:
+        """Returns the parameter names of f or None if f accepts arbitrary keyword arguments.
+        Signatures are cached since inspect.signature is slow and the same modules are called repeatedly."""
+        cache = self.__dict__.setdefault('_parameters_cache', {})
+        entry = cache.get(id(f))
+        if entry is None or entry[0] is not f:
+            # Forget the callables that are no longer in the sequence so that they can be freed.
+            live = {id(g): g for g in self}
+            for k in [k for k, e in cache.items() if live.get(k) is not e[0]]:
+                del cache[k]
             s = inspect.signature(f).parameters
-            if s:
-                if next(reversed(s.values())).kind == inspect.Parameter.VAR_KEYWORD:
-                    local_kwargs = kwargs
-                else:
-                    local_kwargs = {k: v for k, v in kwargs.items() if k in s}
+            if s and next(reversed(s.values())).kind == inspect.Parameter.VAR_KEYWORD:
+                entry = f, None
             else:
-                local_kwargs = {}
-            x = f(x, **local_kwargs)
+                entry = f, frozenset(s)
+            cache[id(f)] = entry
+        return entry[1]
+
+
+class ScannedSequential(Sequential):
+    """Executes modules in the order they were passed to the constructor, running consecutive identical modules
+    with a single ``lax.scan`` loop.
+
+    Consecutive modules of the same class, with the same attributes and variable shapes, that preserve the shape of
+    their input (for example the blocks of a ResNet stage) are compiled once and iterated over their stacked
+    variables instead of being traced one after the other. This reduces the size of the compiled graph and the
+    compilation time of deep networks, the result is the same as the one of Sequential. Variables remain stored in
+    each module, so ``vars()``, optimizers and checkpoints are unaffected. Modules that share variables, hold a
+    random state (for example Dropout) or draw from the default random generator are run one by one.
+
+    The loop is traced again on every call, so ScannedSequential should be called inside ``objax.Jit`` or
+    ``objax.Parallel``.
+    """
+
+    def __call__(self, x: JaxArray, **kwargs) -> JaxArray:
+        """Execute the sequence of operation contained on ``x`` and ``**kwargs`` and return result."""
+        start = 0
+        while start < len(self):
+            f = self[start]
+            end = start + 1
+            if isinstance(f, Module):
+                # A module or variable appearing twice in a loop would be updated from the same state in both
+                # iterations, so the loop stops before anything already in it.
+                seen = {id(f)} | {id(v) for v in f.vars().values()}
+                while end < len(self) and _same_structure(f, self[end]):
+                    owned = {id(self[end])} | {id(v) for v in self[end].vars().values()}
+                    if seen & owned:
+                        break
+                    seen |= owned
+                    end += 1
+            key = random.DEFAULT_GENERATOR.key.value
+            y = f(x, **self._local_kwargs(f, kwargs))
+            # A module which advanced the default generator would get the same random numbers in every iteration.
+            if (end - start > 2 and y.shape == x.shape and y.dtype == x.dtype and
+                    random.DEFAULT_GENERATOR.key.value is key):
+                y = self._scan(self[start + 1:end], y, self._local_kwargs(f, kwargs))
+            else:
+                for f in self[start + 1:end]:
+                    y = f(y, **self._local_kwargs(f, kwargs))
+            x = y
+            start = end
+        return x
+
+    @staticmethod
+    def _scan(modules: List[Module], x: JaxArray, kwargs: Dict[str, Any]) -> JaxArray:
+        """Applies identical modules in sequence with lax.scan over their stacked variables."""
+        vcs = [m.vars() for m in modules]
+        vc = vcs[0]
+
+        def step(y, tensors):
+            original_values = vc.tensors()
+            vc.assign(tensors)
+            try:
+                y = modules[0](y, **kwargs)
+                states = vc.tensors(BaseState)
+            finally:
+                vc.assign(original_values)
+            return y, states
+
+        x, states = lax.scan(step, x, [jn.stack(t) for t in zip(*(v.tensors() for v in vcs))])
+        for i, v in enumerate(vcs):
+            v.subset(BaseState).assign([s[i] for s in states])
         return x
 
 
+def _same_structure(a: Any, b: Any, root: bool = True) -> bool:
+    """Returns True if modules a and b are distinct but interchangeable: same classes, same attributes and variables of
+    the same shapes, so that a compiled call of a can be reused for b by swapping variable values."""
+    if type(a) is not type(b) or (root and not isinstance(a, Module)):
+        return False
+    if isinstance(a, BaseVar):
+        return (a is not b and not isinstance(a, RandomState) and
+                a.value.shape == b.value.shape and a.value.dtype == b.value.dtype)
+    if isinstance(a, Module):
+        if a is b:
+            return False
+        if isinstance(a, ModuleList) and (len(a) != len(b) or
+                                          not all(_same_structure(u, v, False) for u, v in zip(a, b))):
+            return False
+        # The Sequential signature cache does not affect the computation.
+        ka = [k for k in a.__dict__ if k != '_parameters_cache']
+        kb = [k for k in b.__dict__ if k != '_parameters_cache']
+        return ka == kb and all(_same_structure(a.__dict__[k], b.__dict__[k], False) for k in ka)
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
 class SyncedBatchNorm(BatchNorm):
     """Synchronized batch normalization which aggregates batch statistics across all devices (GPUs/TPUs)."""
 
-    def __call__(self, x: JaxArray, training: bool, batch_norm_update: bool = True) -> JaxArray:
+    def __call__(self, x: JaxArray, training: bool, batch_norm_update: bool = True,
+                 sync_stats: bool = True) -> JaxArray:
+        """Performs synchronized batch normalization of input tensor.
+
+        Args:
+            x: input tensor.
+            training: if True compute batch normalization in training mode (accumulating batch statistics),
+                otherwise compute in evaluation mode (using already accumulated batch statistics).
+            batch_norm_update: if True update the running statistics in training mode.
+            sync_stats: if True aggregate batch statistics across all devices in training mode, otherwise use the
+                statistics of the local batch and skip the cross-device communication.
+
+        Returns:
+            Batch normalized tensor.
+        """
         if training:
-            m = functional.parallel.pmean(x.mean(self.redux, keepdims=True))
-            v = functional.parallel.pmean((x ** 2).mean(self.redux, keepdims=True) - m ** 2)
+            moments = self._moments(x)
+            if sync_stats:
+                # Reduce both moments with a single all-reduce.
+                moments = functional.parallel.pmean(moments)
+            m, m2 = moments
+            v = m2 - m * m
             if batch_norm_update:
-                self.running_mean.value += (1 - self.momentum) * (m - self.running_mean.value)
-                self.running_var.value += (1 - self.momentum) * (v - self.running_var.value)
+                rm, rv = self.running_mean.value, self.running_var.value
+                self.running_mean.value = (self.momentum * rm + (1 - self.momentum) * m).astype(rm.dtype)
+                self.running_var.value = (self.momentum * rv + (1 - self.momentum) * v).astype(rv.dtype)
         else:
             m, v = self.running_mean.value, self.running_var.value
-        y = self.gamma.value * (x - m) * functional.rsqrt(v + self.eps) + self.beta.value
-        return y
+        scale = self.gamma.value * functional.rsqrt(v + self.eps)
+        bias = self.beta.value - scale * m
+        return scale.astype(x.dtype) * x + bias.astype(x.dtype)
 
 
 class SyncedBatchNorm0D(SyncedBatchNorm):
@@ -370,15 +583,16 @@ class SyncedBatchNorm0D(SyncedBatchNorm):
     Compared to regular batch norm this usually leads to better accuracy at a slight performance cost.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, dtype: jn.dtype = jn.float32):
         """Creates a SyncedBatchNorm0D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            dtype: data type of the running statistics and of the trainable parameters.
         """
-        super().__init__((1, nin), (0,), momentum, eps)
+        super().__init__((1, nin), (0,), momentum, eps, dtype)
 
 
 class SyncedBatchNorm1D(SyncedBatchNorm):
@@ -388,30 +602,37 @@ class SyncedBatchNorm1D(SyncedBatchNorm):
     Compared to regular batch norm this usually leads to better accuracy at a slight performance cost.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, dtype: jn.dtype = jn.float32):
         """Creates a SyncedBatchNorm1D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            dtype: data type of the running statistics and of the trainable parameters.
         """
-        super().__init__((1, nin, 1), (0, 2), momentum, eps)
+        super().__init__((1, nin, 1), (0, 2), momentum, eps, dtype)
 
 
 class SyncedBatchNorm2D(SyncedBatchNorm):
-    """Applies a 2D synchronized batch normalization on a 4D-input batch of shape (N,C,H,W).
+    """Applies a 2D synchronized batch normalization on a 4D-input batch of shape (N,C,H,W) or (N,H,W,C).
 
     Synchronized batch normalization aggregated batch statistics across all devices (GPUs/TPUs) on each call.
     Compared to regular batch norm this usually leads to better accuracy at a slight performance cost.
     """
 
-    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6):
+    def __init__(self, nin: int, momentum: float = 0.999, eps: float = 1e-6, nhwc: bool = False,
+                 dtype: jn.dtype = jn.float32):
         """Creates a SyncedBatchNorm2D module instance.
 
         Args:
             nin: number of channels in the input example.
             momentum: value used to compute exponential moving average of batch statistics.
             eps: small value which is used for numerical stability.
+            nhwc: if True the input batch has shape (N,H,W,C), otherwise (N,C,H,W).
+            dtype: data type of the running statistics and of the trainable parameters.
         """
-        super().__init__((1, nin, 1, 1), (0, 2, 3), momentum, eps)
+        if nhwc:
+            super().__init__((1, 1, 1, nin), (0, 1, 2), momentum, eps, dtype)
+        else:
+            super().__init__((1, nin, 1, 1), (0, 2, 3), momentum, eps, dtype)
@@ -21,9 +21,11 @@ os.environ['XLA_FLAGS'] = ' '.join(os.environ.get('XLA_FLAGS', '').split(' ')
 
 import unittest
 
-import objax
+import jax.numpy as jn
 import numpy as np
 
+import objax
+
 
 class TestBatchnorm(unittest.TestCase):
 
@@ -57,6 +59,69 @@ class TestBatchnorm(unittest.TestCase):
         ye = bn(x, training=False)
         self.assertEqual(ye.shape, x.shape)
 
+    def test_batchnorm_values(self):
+        x = objax.random.normal((64, 3, 16, 16))
+        bn = objax.nn.BatchNorm2D(3)
+        bn.gamma.assign(objax.random.normal((1, 3, 1, 1)))
+        bn.beta.assign(objax.random.normal((1, 3, 1, 1)))
+        m = x.mean((0, 2, 3), keepdims=True)
+        v = x.var((0, 2, 3), keepdims=True)
+        # run batch norm in training mode
+        yt = bn(x, training=True)
+        expected_yt = bn.gamma.value * (x - m) / np.sqrt(v + bn.eps) + bn.beta.value
+        np.testing.assert_allclose(yt, expected_yt, atol=1e-4)
+        # run batch norm in eval mode
+        ye = bn(x, training=False)
+        rm, rv = bn.running_mean.value, bn.running_var.value
+        expected_ye = bn.gamma.value * (x - rm) / np.sqrt(rv + bn.eps) + bn.beta.value
+        np.testing.assert_allclose(ye, expected_ye, atol=1e-4)
+
+    def test_batchnorm_dtype(self):
+        x = objax.random.normal((64, 3, 16, 16))
+        bn = objax.nn.BatchNorm2D(3, dtype=jn.bfloat16)
+        bn_ref = objax.nn.BatchNorm2D(3)
+        for v in bn.vars().values():
+            self.assertEqual(v.value.dtype, jn.bfloat16)
+        # run batch norm in training mode
+        yt = bn(x, training=True)
+        self.assertEqual(yt.dtype, x.dtype)
+        np.testing.assert_allclose(yt, bn_ref(x, training=True), atol=1e-2)
+        self.assertEqual(bn.running_mean.value.dtype, jn.bfloat16)
+        self.assertEqual(bn.running_var.value.dtype, jn.bfloat16)
+        # run batch norm in eval mode
+        ye = bn(x, training=False)
+        self.assertEqual(ye.dtype, x.dtype)
+        np.testing.assert_allclose(ye, bn_ref(x, training=False), atol=1e-2)
+
+    def test_batchnorm_2d_nhwc(self):
+        x = objax.random.normal((64, 3, 16, 16))
+        bn = objax.nn.BatchNorm2D(3)
+        bn_nhwc = objax.nn.BatchNorm2D(3, nhwc=True)
+        self.assertEqual(bn_nhwc.running_mean.value.shape, (1, 1, 1, 3))
+        # run batch norm in training mode
+        yt = bn(x, training=True)
+        yt_nhwc = bn_nhwc(x.transpose((0, 2, 3, 1)), training=True)
+        np.testing.assert_allclose(yt_nhwc, yt.transpose((0, 2, 3, 1)), atol=1e-5)
+        # run batch norm in eval mode
+        ye = bn(x, training=False)
+        ye_nhwc = bn_nhwc(x.transpose((0, 2, 3, 1)), training=False)
+        np.testing.assert_allclose(ye_nhwc, ye.transpose((0, 2, 3, 1)), atol=1e-5)
+
+    def test_batchnorm_2d_fold_into(self):
+        for use_bias in (False, True):
+            for nhwc in (False, True):
+                x = objax.random.normal((16, 8, 8, 3) if nhwc else (16, 3, 8, 8))
+                conv = objax.nn.Conv2D(3, 4, 3, use_bias=use_bias, nhwc=nhwc)
+                bn = objax.nn.BatchNorm2D(4, momentum=0.5, nhwc=nhwc)
+                if use_bias:
+                    conv.b.assign(objax.random.normal(conv.b.value.shape))
+                bn.gamma.assign(objax.random.normal(bn.gamma.value.shape))
+                bn.beta.assign(objax.random.normal(bn.beta.value.shape))
+                # accumulate some batch statistics
+                bn(conv(x), training=True)
+                folded = bn.fold_into(conv)
+                np.testing.assert_allclose(folded(x), bn(conv(x), training=False), atol=1e-4)
+
 
 class TestSyncBatchnorm(unittest.TestCase):
 
@@ -110,6 +175,21 @@ class TestSyncBatchnorm(unittest.TestCase):
         x = objax.random.normal((64, 3, 16, 16))
         self.helper_test_syncbn(x, lambda: objax.nn.BatchNorm2D(3), lambda: objax.nn.SyncedBatchNorm2D(3))
 
+    def test_syncbn_local_stats(self):
+        x = objax.random.normal((64, 3, 16, 16))
+        bn = objax.nn.BatchNorm2D(3)
+        bn_train = objax.Parallel(lambda x: bn(x, training=True), vc=bn.vars())
+        sync_bn = objax.nn.SyncedBatchNorm2D(3)
+        sync_bn_train = objax.Parallel(lambda x: sync_bn(x, training=True, sync_stats=False), vc=sync_bn.vars())
+        with bn.vars().replicate():
+            yt = bn_train(x)
+        with sync_bn.vars().replicate():
+            yt_syncbn = sync_bn_train(x)
+        # without synchronization each device uses its local statistics, like regular batch norm
+        self.assertTensorsAlmostEqual(yt, yt_syncbn)
+        self.assertTensorsAlmostEqual(bn.running_mean.value, sync_bn.running_mean.value)
+        self.assertTensorsAlmostEqual(bn.running_var.value, sync_bn.running_var.value)
+
 
 if __name__ == '__main__':
     unittest.main()
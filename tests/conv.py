@@ -200,6 +200,23 @@ class TestConv(unittest.TestCase):
         self.assertEqual(features.shape, (1, 2, 3, 3))
         self.assertTrue(jn.array_equal(features, expected_features))
 
+    def test_on_conv2d_nhwc(self):
+        """
+        Pass an input through a convolution in NHWC layout and
+        test that it matches the NCHW result.
+        """
+
+        x = objax.random.normal((2, 3, 8, 8))
+        conv_nchw = objax.nn.Conv2D(3, 4, 3, strides=2)
+        conv_nhwc = objax.nn.Conv2D(3, 4, 3, strides=2, nhwc=True)
+        conv_nhwc.w.assign(conv_nchw.w.value)
+        conv_nchw.b.assign(objax.random.normal((4, 1, 1)))
+        conv_nhwc.b.assign(conv_nchw.b.value.reshape((1, 1, 1, 4)))
+        y_nchw = conv_nchw(x)
+        y_nhwc = conv_nhwc(x.transpose((0, 2, 3, 1)))
+        self.assertEqual(y_nhwc.shape, (2, 4, 4, 4))
+        self.assertTrue(jn.allclose(y_nhwc, y_nchw.transpose((0, 2, 3, 1)), atol=1e-5))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -102,6 +102,34 @@ class TestDropout(unittest.TestCase):
         drop_output = dropout_layer(drop_input, training)
         self.assertTrue(jn.array_equal(drop_input, drop_output))
 
+    def test_on_dropout_jit_static(self):
+        """
+        Pass an input through a jitted Dropout layer with training
+        as a static argument and test both modes.
+        """
+
+        drop_input = jn.arange(1., 101.).reshape((1, 100))
+        dropout_layer = objax.nn.Dropout(0.5)
+        jit_dropout = objax.Jit(lambda x, training: dropout_layer(x, training), dropout_layer.vars(),
+                                static_argnums=(1,))
+        self.assertTrue(jn.array_equal(jit_dropout(drop_input, False), drop_input))
+        drop_output = jit_dropout(drop_input, True)
+        self.assertLess(jn.count_nonzero(drop_output), 100)
+        self.assertTrue(jn.array_equal(jn.where(drop_output != 0, drop_input / 0.5, 0), drop_output))
+
+    def test_on_dropout_keep_override(self):
+        """
+        Pass an input through a Dropout layer while overriding
+        the keep probability and test that the override is used, including 0.
+        """
+
+        drop_input = jn.array([[1., 2., 3., 4., 5., 6.]])
+        dropout_layer = objax.nn.Dropout(0.5)
+        drop_output = dropout_layer(drop_input, True, dropout_keep=1.0)
+        self.assertTrue(jn.array_equal(drop_input, drop_output))
+        drop_output = dropout_layer(drop_input, True, dropout_keep=0.0)
+        self.assertEqual(jn.count_nonzero(drop_output), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
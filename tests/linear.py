@@ -16,6 +16,7 @@
 
 import unittest
 
+import jax
 import jax.numpy as jn
 
 import objax
@@ -60,6 +61,21 @@ class TestLinear(unittest.TestCase):
         self.assertEqual(features.shape, (2, 3))
         self.assertTrue(jn.array_equal(features, expected_features))
 
+    def test_on_linear_precision(self):
+        """
+        Pass an input through a linear filter with explicit matmul precision and
+        test that it matches the default precision on this backend.
+        """
+
+        linear_filter = objax.nn.Linear(4, 3)
+        linear_highest = objax.nn.Linear(4, 3, precision=jax.lax.Precision.HIGHEST)
+        linear_highest.w.assign(linear_filter.w.value)
+
+        data = objax.random.normal((2, 5, 4))
+        features = linear_highest(data)
+        self.assertEqual(features.shape, (2, 5, 3))
+        self.assertTrue(jn.allclose(features, linear_filter(data), atol=1e-5))
+
 
 if __name__ == '__main__':
     unittest.main()
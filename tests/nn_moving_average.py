@@ -41,6 +41,27 @@ class TestMovingAverage(unittest.TestCase):
         np.testing.assert_allclose(x_ma2, np.array([[0, 0.5, 1]]))
         np.testing.assert_allclose(x_ma3, np.array([[-1.5, -2, 2.5]]))
 
+    def test_MovingAverage_long(self):
+        """Test MovingAverage over many passes of its buffer, compiled."""
+        xs = objax.random.normal((50, 3))
+        ma = objax.nn.MovingAverage(shape=(3,), buffer_size=4)
+        ma_jit = objax.Jit(ma)
+        for i in range(xs.shape[0]):
+            x_ma = ma_jit(xs[i])
+            np.testing.assert_allclose(x_ma, xs[max(0, i - 3):i + 1].sum(0) / 4, atol=1e-6)
+
+    def test_MovingAverage_assign(self):
+        """Test MovingAverage after assigning its buffer and running sum."""
+        ma = objax.nn.MovingAverage(shape=(3,), buffer_size=2)
+        ma.buffer.assign(jn.array([[2., 2., 2.], [4., 4., 4.]]))
+        ma.running_sum.assign(ma.buffer.value.sum(0))
+
+        x_ma1 = ma(jn.zeros(3))
+        x_ma2 = ma(jn.zeros(3))
+
+        np.testing.assert_allclose(x_ma1, np.array([2, 2, 2]))
+        np.testing.assert_allclose(x_ma2, np.array([0, 0, 0]))
+
     def test_ExponentialMovingAverage(self):
         """Test ExponentialMovingAverage."""
         x1 = jn.array([[0, 1, 2]]) * 100
@@ -62,6 +62,128 @@ class TestSequential(unittest.TestCase):
         self.assertEqual(features.shape, (2, 3))
         self.assertTrue(jn.array_equal(features, expected_features))
 
+    def test_on_sequential_kwargs(self):
+        """
+        Pass an input through a sequence where only some modules accept keyword arguments
+        and test that each module receives the arguments it expects, including after
+        the sequence is modified.
+        """
+
+        def scale(x, training, factor=1.):
+            return x * factor if training else x
+
+        sequential = objax.nn.Sequential([objax.functional.relu, scale, lambda x, **kwargs: x + len(kwargs)])
+        data = jn.array([[1., -1.], [2., -2.]])
+        self.assertTrue(jn.array_equal(sequential(data, training=False, factor=3.),
+                                       jn.array([[3., 2.], [4., 2.]])))
+        self.assertTrue(jn.array_equal(sequential(data, training=True, factor=3.),
+                                       jn.array([[5., 2.], [8., 2.]])))
+        sequential[1] = lambda x, factor: x * factor
+        self.assertTrue(jn.array_equal(sequential(data, training=True, factor=3.),
+                                       jn.array([[5., 2.], [8., 2.]])))
+        sequential[1] = lambda x: -x
+        self.assertTrue(jn.array_equal(sequential(data, training=True, factor=3.),
+                                       jn.array([[1., 2.], [0., 2.]])))
+        cached = [e[0] for e in sequential._parameters_cache.values()]
+        self.assertEqual(len(cached), len(sequential))
+        self.assertTrue(all(any(f is g for g in sequential) for f in cached))
+
+    def test_on_scanned_sequential(self):
+        """
+        Pass an input through a sequence of identical blocks with batch norm and
+        test that ScannedSequential matches Sequential, including state updates and gradients.
+        """
+
+        def block():
+            return objax.nn.Sequential([objax.nn.Linear(4, 4), objax.nn.BatchNorm0D(4), objax.functional.relu])
+
+        blocks = [objax.nn.Linear(3, 4)] + [block() for _ in range(4)] + [objax.nn.Linear(4, 2)]
+        sequential = objax.nn.Sequential(blocks)
+        scanned = objax.nn.ScannedSequential(blocks)
+        data = objax.random.normal((8, 3))
+        tensors = sequential.vars().tensors()
+        expected_features = sequential(data, training=True)
+        expected_states = sequential.vars().subset(objax.StateVar).tensors()
+        sequential.vars().assign(tensors)
+        features = scanned(data, training=True)
+        self.assertEqual(features.shape, (8, 2))
+        self.assertTrue(jn.allclose(features, expected_features, atol=1e-5))
+        for state, expected_state in zip(scanned.vars().subset(objax.StateVar).tensors(), expected_states):
+            self.assertTrue(jn.allclose(state, expected_state, atol=1e-6))
+
+        def loss(m):
+            return lambda x: (m(x, training=False) ** 2).mean()
+
+        expected_grads, _ = objax.GradValues(loss(sequential), sequential.vars())(data)
+        grads, _ = objax.Jit(objax.GradValues(loss(scanned), scanned.vars()))(data)
+        for g, expected_g in zip(grads, expected_grads):
+            self.assertTrue(jn.allclose(g, expected_g, atol=1e-5))
+
+    def test_on_scanned_sequential_heterogeneous(self):
+        """
+        Pass an input through a ScannedSequential whose modules cannot be scanned and
+        test that it matches Sequential, including state updates of shared modules.
+        """
+
+        class Count(objax.Module):
+            def __init__(self):
+                self.n = objax.StateVar(jn.array(0))
+
+            def __call__(self, x):
+                self.n.value += 1
+                return x + 1
+
+        class Private(objax.Module):
+            def __init__(self, factor, size):
+                self.w = objax.TrainVar(jn.ones(()))
+                self._f = factor
+                self._v = objax.TrainVar(jn.zeros(size))
+
+            def __call__(self, x):
+                return x * self.w.value * self._f + self._v.value.sum()
+
+        linear_filter = objax.nn.Linear(3, 3)
+        modules = [objax.nn.Linear(2, 3), linear_filter, linear_filter, objax.functional.relu,
+                   objax.nn.Dropout(0.5), objax.nn.Dropout(0.5), objax.nn.Linear(3, 3), objax.nn.Linear(3, 3)]
+        data = objax.random.normal((4, 2))
+        expected_features = objax.nn.Sequential(modules)(data, training=False)
+        features = objax.nn.ScannedSequential(modules)(data, training=False)
+        self.assertTrue(jn.array_equal(features, expected_features))
+
+        data = jn.ones(2)
+        for scanned in (False, True):
+            a, b = Count(), Count()
+            sequential = (objax.nn.ScannedSequential if scanned else objax.nn.Sequential)([a, b, b])
+            self.assertTrue(jn.array_equal(sequential(data), jn.array([4., 4.])))
+            self.assertEqual((int(a.n.value), int(b.n.value)), (1, 2))
+
+        modules = [Private(1, 1), Private(2, 1), Private(3, 1), Private(4, 1)]
+        self.assertTrue(jn.array_equal(objax.nn.ScannedSequential(modules)(data), jn.array([24., 24.])))
+        modules = [Private(1, k) for k in range(1, 5)]
+        self.assertTrue(jn.array_equal(objax.nn.ScannedSequential(modules)(data), data))
+
+    def test_on_scanned_sequential_default_generator(self):
+        """
+        Pass an input through a ScannedSequential of identical modules drawing from the default
+        random generator and test that it matches Sequential and leaves the generator usable.
+        """
+
+        class Noise(objax.Module):
+            def __init__(self):
+                self.w = objax.TrainVar(jn.ones(3))
+
+            def __call__(self, x):
+                return x * self.w.value + objax.random.normal(x.shape)
+
+        modules = [Noise() for _ in range(4)]
+        data = jn.zeros((2, 3))
+        objax.random.DEFAULT_GENERATOR.seed(1)
+        expected_features = objax.nn.Sequential(modules)(data)
+        objax.random.DEFAULT_GENERATOR.seed(1)
+        features = objax.nn.ScannedSequential(modules)(data)
+        self.assertTrue(jn.allclose(features, expected_features))
+        self.assertEqual(objax.random.normal((2,)).shape, (2,))
+
 
 if __name__ == '__main__':
     unittest.main()